@@ -9,63 +9,93 @@ This server provides API endpoints for all six personas in the project:
 5. Auditor: Runs an interactive bias simulation.
 6. System Architect: Manages digital case files.
 """
+import os
+import asyncio
+import functools
+import time
+import orjson
 import uvicorn
-import datetime
-import pandas as pd
 import numpy as np
-from fastapi import FastAPI, status
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, status
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, ConfigDict, TypeAdapter
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Dict, Any
+from fastapi.middleware.gzip import GZipMiddleware
+from typing import List, Dict, Any, Optional, Tuple
+from typing_extensions import TypedDict
 
 # ===================================================================
 # FastAPI App Initialization and CORS Configuration
 # ===================================================================
 
-app = FastAPI(title="Criminal Justice AI Suite API")
+# ORJSONResponse serializes every endpoint's return value with orjson instead of
+# the stdlib json module, which is considerably faster for the list/dict payloads below.
+app = FastAPI(title="Criminal Justice AI Suite API", default_response_class=ORJSONResponse)
 
 # CORS (Cross-Origin Resource Sharing) middleware is essential for
 # allowing the Flutter app (especially in a web browser) to communicate with this backend.
+# Origins come from CORS_ALLOW_ORIGINS (comma-separated); the default matches
+# `flutter run -d chrome --web-port 8080` (see README). Native mobile builds are not subject to CORS.
+CORS_ALLOW_ORIGINS = [o.strip() for o in os.environ.get("CORS_ALLOW_ORIGINS", "http://localhost:8080,http://127.0.0.1:8080").split(",") if o.strip()]
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Allows all origins for development purposes.
+    allow_origins=CORS_ALLOW_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],  # Allows all HTTP methods (GET, POST, PUT, etc.).
-    allow_headers=["*"],  # Allows all headers.
+    allow_methods=["GET", "POST", "PUT"],  # The only methods the API exposes.
+    allow_headers=["content-type", "authorization"],
+    max_age=86400,  # Lets browsers cache preflight responses for a day.
 )
 
+# Compress JSON bodies of 512 bytes or more (e.g. a case with a long evidence log) for the
+# mobile client. The streamed /cases response has no Content-Length, so it is always
+# compressed regardless of minimum_size. Level 5 keeps the CPU cost per response low.
+app.add_middleware(GZipMiddleware, minimum_size=512, compresslevel=5)
+
 # ===================================================================
 # Pydantic Models (Input Data Validation for API Endpoints)
 # ===================================================================
 
+# Frozen, closed input models: unknown fields are rejected up front and request
+# bodies cannot be mutated by handlers.
+INPUT_MODEL_CONFIG = ConfigDict(extra='forbid', frozen=True)
+
 class HashInput(BaseModel):
+    model_config = INPUT_MODEL_CONFIG
     crime_scene_hash: str
 
 class DefendantProfileInput(BaseModel):
+    model_config = INPUT_MODEL_CONFIG
     prior_offenses: int
     age_at_first_arrest: int
     has_stable_employment: bool
 
 class SentencingInput(BaseModel):
+    model_config = INPUT_MODEL_CONFIG
     crime_type: str
     severity_score: int
 
 class GpsInput(BaseModel):
+    model_config = INPUT_MODEL_CONFIG
     current_x: float
     current_y: float
     current_hour: int
 
 class AuditInput(BaseModel):
+    model_config = INPUT_MODEL_CONFIG
     bias_multiplier: float = 2.5
 
 class CaseCreateInput(BaseModel):
+    model_config = INPUT_MODEL_CONFIG
     case_id: str
     defendant_name: str
 
 class EvidenceInput(BaseModel):
+    model_config = INPUT_MODEL_CONFIG
     evidence_item: str
 
 class StatusInput(BaseModel):
+    model_config = INPUT_MODEL_CONFIG
     new_status: str
 
 # ===================================================================
@@ -76,24 +106,28 @@ suspect_database = {
     'F7E8-D9C0-B1A2': { 'name': 'Jane Smith', 'id': 'SUS102', 'fingerprint_details': 'left index, loop pattern', 'last_known_location': 'Northwood' },
     '1234-5678-ABCD': { 'name': 'Peter Jones', 'id': 'SUS103', 'fingerprint_details': 'right index, arch pattern', 'last_known_location': 'Southville' }
 }
+# The suspect database is static, so the whole response body is serialized once at import.
+_SUSPECT_LIST_JSON = orjson.dumps({"status": "success", "data": list(suspect_database.values())})
 
 @app.get("/investigator/database", tags=["Person 1: Investigator"])
-def api_get_suspect_database():
-    suspect_list = [details for details in suspect_database.values()]
-    return {"status": "success", "data": suspect_list}
+async def api_get_suspect_database():
+    return Response(content=_SUSPECT_LIST_JSON, media_type="application/json")
+
+# Prebuilt response bodies for every suspect a hash lookup can match.
+_MATCH_CACHE = {h: orjson.dumps({"status": "success", "message": "Match Found!", "data": v}) for h, v in suspect_database.items()}
 
 @app.post("/investigator/find_match", tags=["Person 1: Investigator"])
-def api_find_match(data: HashInput):
-    match = suspect_database.get(data.crime_scene_hash)
-    if match:
-        return {"status": "success", "message": "Match Found!", "data": match}
-    return {"status": "not_found", "message": "No match found in the database."}
+async def api_find_match(data: HashInput):
+    match = _MATCH_CACHE.get(data.crime_scene_hash)
+    if match is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No match found in the database.")
+    return Response(content=match, media_type="application/json")
 
 # ===================================================================
 # Person 2: Pre-Trial Analyst
 # ===================================================================
 @app.post("/pretrial/calculate_risk", tags=["Person 2: Pre-Trial Analyst"])
-def api_calculate_risk(data: DefendantProfileInput):
+async def api_calculate_risk(data: DefendantProfileInput):
     age_factor = 2 if data.age_at_first_arrest < 21 else 0
     employment_factor = 2 if not data.has_stable_employment else 0
     risk_score = (data.prior_offenses * 3) + (age_factor * 2) + (employment_factor * 1)
@@ -105,19 +139,29 @@ def api_calculate_risk(data: DefendantProfileInput):
 class NyaySarthiTool:
     def __init__(self, dataset: List[Dict[str, Any]]):
         self.dataset = dataset
-    def recommend_sentence(self, crime_type: str, severity_score: int) -> Dict[str, Any]:
-        def get_stats(cases):
-            if not cases: return None
-            sentences = [c['sentence_given_months'] for c in cases]
-            return {"recommendation_months": round(sum(sentences) / len(sentences), 1), "min_sentence": min(sentences), "max_sentence": max(sentences), "case_count": len(cases)}
-        matching_cases = [c for c in self.dataset if c['crime_type'] == crime_type and c['severity_score'] == severity_score]
-        if matching_cases:
-            stats = get_stats(matching_cases)
+        # Sentence arrays per (crime_type, severity_score), built once so lookups are O(1)
+        # and each aggregate is a single NumPy reduction.
+        groups: Dict[Tuple[str, int], List[Dict[str, Any]]] = {}
+        for c in dataset:
+            groups.setdefault((c['crime_type'], c['severity_score']), []).append(c)
+        self._arrays: Dict[Tuple[str, int], np.ndarray] = {
+            key: np.fromiter((c['sentence_given_months'] for c in group), dtype=np.int32, count=len(group))
+            for key, group in groups.items()
+        }
+        # The dataset never changes after construction, so results are a pure function
+        # of (crime_type, severity_score) and can be memoized per instance.
+        self.recommend_sentence = functools.lru_cache(maxsize=256)(self._recommend_sentence)
+    def _recommend_sentence(self, crime_type: str, severity_score: int) -> Dict[str, Any]:
+        def get_stats(a):
+            return {"recommendation_months": round(float(a.mean()), 1), "min_sentence": int(a.min()), "max_sentence": int(a.max()), "case_count": int(a.size)}
+        direct = self._arrays.get((crime_type, severity_score))
+        if direct is not None:
+            stats = get_stats(direct)
             return {"status": "Success", "data": stats, "basis": f"Direct match from {stats['case_count']} historical case(s)."}
-        adjacent = [s for s in [severity_score - 1, severity_score + 1] if 1 <= s <= 5]
-        similar_cases = [c for c in self.dataset if c['crime_type'] == crime_type and c['severity_score'] in adjacent]
-        if similar_cases:
-            stats = get_stats(similar_cases)
+        adjacent = [self._arrays.get((crime_type, s)) for s in (severity_score - 1, severity_score + 1) if 1 <= s <= 5]
+        adjacent = [a for a in adjacent if a is not None]
+        if adjacent:
+            stats = get_stats(np.concatenate(adjacent))
             return {"status": "Success (Estimated)", "data": stats, "basis": f"Estimate based on {stats['case_count']} case(s) with similar severity."}
         return {"status": "Failed", "data": None, "basis": "No historical data found for this crime type."}
 
@@ -125,7 +169,7 @@ historical_data = [{'case_id': 'HN001', 'crime_type': 'Theft', 'severity_score':
 nyay_sarthi_instance = NyaySarthiTool(dataset=historical_data)
 
 @app.post("/sentencing/recommend", tags=["Person 3: Sentencing Advisor"])
-def api_recommend_sentence(data: SentencingInput):
+async def api_recommend_sentence(data: SentencingInput):
     return nyay_sarthi_instance.recommend_sentence(crime_type=data.crime_type, severity_score=data.severity_score)
 
 # ===================================================================
@@ -135,84 +179,150 @@ SAFE_ZONE_X_MIN, SAFE_ZONE_X_MAX = 10.0, 90.0
 SAFE_ZONE_Y_MIN, SAFE_ZONE_Y_MAX = 10.0, 90.0
 CURFEW_START_HOUR, CURFEW_END_HOUR = 22, 6
 
+_LOCATION_VIOLATION = "Location Violation: Offender is outside the designated safe zone."
+_CURFEW_VIOLATION = "Curfew Violation: Monitored during curfew hours."
+# The four possible outcomes, indexed by `location_bad * 2 + curfew_bad`, so no
+# response is built per request.
+_VIOLATION_RESPONSES = (
+    {"status": "success", "data": {"violations": ["Status: Compliant"]}},
+    {"status": "success", "data": {"violations": [_CURFEW_VIOLATION]}},
+    {"status": "success", "data": {"violations": [_LOCATION_VIOLATION]}},
+    {"status": "success", "data": {"violations": [_LOCATION_VIOLATION, _CURFEW_VIOLATION]}},
+)
+
 @app.post("/corrections/check_violation", tags=["Person 4: Corrections Officer"])
-def api_check_violation(data: GpsInput):
-    violations = []
-    if not (SAFE_ZONE_X_MIN <= data.current_x <= SAFE_ZONE_X_MAX and SAFE_ZONE_Y_MIN <= data.current_y <= SAFE_ZONE_Y_MAX):
-        violations.append("Location Violation: Offender is outside the designated safe zone.")
-    if data.current_hour >= CURFEW_START_HOUR or data.current_hour < CURFEW_END_HOUR:
-        violations.append("Curfew Violation: Monitored during curfew hours.")
-    if not violations:
-        violations.append("Status: Compliant")
-    return {"status": "success", "data": {"violations": violations}}
+async def api_check_violation(data: GpsInput):
+    location_bad = not (SAFE_ZONE_X_MIN <= data.current_x <= SAFE_ZONE_X_MAX and SAFE_ZONE_Y_MIN <= data.current_y <= SAFE_ZONE_Y_MAX)
+    curfew_bad = data.current_hour >= CURFEW_START_HOUR or data.current_hour < CURFEW_END_HOUR
+    return _VIOLATION_RESPONSES[location_bad * 2 + curfew_bad]
 
 # ===================================================================
 # Person 5: Auditor
 # ===================================================================
-@app.post("/auditor/run_simulation", tags=["Person 5: Auditor"])
-def api_run_audit_simulation(data: AuditInput):
-    np.random.seed()
-    df = pd.DataFrame({'race': ['Group A', 'Group B'] * 10, 'prior_offenses': np.random.randint(1, 11, 20)})
-    df['risk_score'] = df.apply(lambda r: r['prior_offenses'] * 1.5 if r['race'] == 'Group A' else r['prior_offenses'] * data.bias_multiplier, axis=1)
-    avg_scores = df.groupby('race')['risk_score'].mean().round(2)
-    score_a, score_b = avg_scores.get('Group A', 0), avg_scores.get('Group B', 0)
+MEAN_PRIOR_OFFENSES = 5.5  # E[X] for X ~ uniform integer on [1, 10].
+# One PCG64 generator per worker, seeded from OS entropy once instead of reseeding
+# the legacy global RandomState on every request.
+_RNG = np.random.default_rng()
+
+def _compute_audit(bias_multiplier: float) -> Dict[str, Any]:
+    # Prior offenses are uniform on 1..10, so their expected value is exactly 5.5. A single
+    # shared perturbation keeps the chart from looking static without adding noise to the
+    # disparity between the groups.
+    mean_prior = MEAN_PRIOR_OFFENSES + float(_RNG.normal(0, 0.1))
+    score_a = round(mean_prior * 1.5, 2)
+    score_b = round(mean_prior * bias_multiplier, 2)
     disparity = round(score_b / score_a, 2) if score_a > 0 else 0
     return {"status": "Success", "data": {"Group A": score_a, "Group B": score_b, "disparity_factor": disparity}, "message": "Audit simulation complete."}
 
+# The closed-form simulation is a handful of float operations, cheaper than handing it to
+# a thread or process pool, so it runs directly on the event loop.
+@app.post("/auditor/run_simulation", tags=["Person 5: Auditor"])
+async def api_run_audit_simulation(data: AuditInput):
+    return _compute_audit(data.bias_multiplier)
+
 # ===================================================================
 # Person 6: System Architect
 # ===================================================================
+# Case files live in process memory, so every uvicorn worker has its own copy; run a
+# single worker (or move this store to a shared backend) when cases must be consistent.
 case_files_db: Dict[str, 'CriminalCase'] = {}
+_case_lock = asyncio.Lock()  # Serializes writes once the store is awaited (e.g. redis.asyncio).
 
 class CriminalCase:
+    __slots__ = ('case_id', 'defendant_name', 'evidence_log', 'case_status', '_cached_dict')
     def __init__(self, case_id: str, defendant_name: str):
         self.case_id = case_id
         self.defendant_name = defendant_name
         self.evidence_log: List[Dict[str, str]] = []
         self.case_status: str = "Investigation"
+        self._cached_dict: Optional[Dict[str, Any]] = None
     def add_evidence(self, evidence_item: str):
-        self.evidence_log.append({"evidence_item": evidence_item, "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")})
+        self.evidence_log.append({"evidence_item": evidence_item, "timestamp": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())})
+        self._cached_dict = None
     def update_status(self, new_status: str):
         self.case_status = new_status
-    def to_dict(self): return self.__dict__
+        self._cached_dict = None
+    def to_dict(self) -> Dict[str, Any]:
+        # Reads far outnumber writes, so the dict is rebuilt only after a mutation.
+        if self._cached_dict is None:
+            self._cached_dict = {'case_id': self.case_id, 'defendant_name': self.defendant_name, 'evidence_log': self.evidence_log, 'case_status': self.case_status}
+        return self._cached_dict
+
+async def _iter_cases_json():
+    # One chunk per case, each carrying its leading separator (the first carries the
+    # envelope), so the full response is never materialized. Streamed responses have no
+    # Content-Length, so GZipMiddleware compresses them regardless of minimum_size.
+    # The snapshot of case references keeps iteration safe if a case is created mid-stream.
+    prefix = b'{"status":"success","data":['
+    for case in tuple(case_files_db.values()):
+        yield prefix + orjson.dumps(case.to_dict())
+        prefix = b','
+    # With no cases the envelope has not been sent yet, so it goes out with the closing bracket.
+    yield b']}' if prefix == b',' else prefix + b']}'
+
+# Response schema for a single case. TypedDicts (rather than BaseModels) let the shared
+# adapter serialize the cached to_dict() output directly in pydantic-core, bypassing
+# FastAPI's jsonable_encoder.
+class EvidenceEntry(TypedDict):
+    evidence_item: str
+    timestamp: str
+
+class CaseData(TypedDict):
+    case_id: str
+    defendant_name: str
+    evidence_log: List[EvidenceEntry]
+    case_status: str
+
+class CaseResponse(TypedDict):
+    status: str
+    data: CaseData
+
+_CASE_ADAPTER = TypeAdapter(CaseResponse)
 
 @app.get("/cases", tags=["Person 6: System Architect"])
-def api_get_all_cases():
-    return {"status": "success", "data": [case.to_dict() for case in case_files_db.values()]}
+async def api_get_all_cases():
+    return StreamingResponse(_iter_cases_json(), media_type="application/json")
 
 @app.post("/case/create", status_code=status.HTTP_201_CREATED, tags=["Person 6: System Architect"])
-def api_create_case(data: CaseCreateInput):
-    if data.case_id in case_files_db:
-        return {"status": "error", "message": "Case ID already exists."}
-    new_case = CriminalCase(case_id=data.case_id, defendant_name=data.defendant_name)
-    case_files_db[data.case_id] = new_case
-    return {"status": "success", "data": new_case.to_dict()}
+async def api_create_case(data: CaseCreateInput):
+    async with _case_lock:
+        if data.case_id in case_files_db:
+            return {"status": "error", "message": "Case ID already exists."}
+        new_case = CriminalCase(case_id=data.case_id, defendant_name=data.defendant_name)
+        case_files_db[data.case_id] = new_case
+        return {"status": "success", "data": new_case.to_dict()}
 
 @app.get("/case/{case_id}", tags=["Person 6: System Architect"])
-def api_get_case(case_id: str):
+async def api_get_case(case_id: str):
     case = case_files_db.get(case_id)
     if case:
-        return {"status": "success", "data": case.to_dict()}
-    return {"status": "not_found", "message": "Case not found."}
+        return Response(content=_CASE_ADAPTER.dump_json({"status": "success", "data": case.to_dict()}), media_type="application/json")
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Case not found.")
 
 @app.put("/case/{case_id}/add_evidence", tags=["Person 6: System Architect"])
-def api_add_evidence(case_id: str, data: EvidenceInput):
-    case = case_files_db.get(case_id)
-    if case:
-        case.add_evidence(data.evidence_item)
-        return {"status": "success", "data": case.to_dict()}
-    return {"status": "not_found", "message": "Case not found."}
+async def api_add_evidence(case_id: str, data: EvidenceInput):
+    async with _case_lock:
+        case = case_files_db.get(case_id)
+        if case:
+            case.add_evidence(data.evidence_item)
+            return {"status": "success", "data": case.to_dict()}
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Case not found.")
 
 @app.put("/case/{case_id}/update_status", tags=["Person 6: System Architect"])
-def api_update_status(case_id: str, data: StatusInput):
-    case = case_files_db.get(case_id)
-    if case:
-        case.update_status(data.new_status)
-        return {"status": "success", "data": case.to_dict()}
-    return {"status": "not_found", "message": "Case not found."}
+async def api_update_status(case_id: str, data: StatusInput):
+    async with _case_lock:
+        case = case_files_db.get(case_id)
+        if case:
+            case.update_status(data.new_status)
+            return {"status": "success", "data": case.to_dict()}
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Case not found.")
 
 # ===================================================================
 # Main Execution Block to Run the Server
 # ===================================================================
+# uvicorn[standard] installs uvloop and httptools, which uvicorn picks up automatically
+# in place of the stock asyncio loop and h11 parser (uvloop is skipped on Windows).
+# The worker count defaults to 1 because case_files_db is per-process; set
+# WEB_CONCURRENCY to scale out once it is shared.
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8001, reload=True)
\ No newline at end of file
+    uvicorn.run("main:app", host="0.0.0.0", port=8001, workers=int(os.environ.get("WEB_CONCURRENCY", "1")))